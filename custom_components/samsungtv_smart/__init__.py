@@ -2,11 +2,23 @@
 
 import socket
 import asyncio
+import ipaddress
 import logging
 import os
+import time
 from aiohttp import ClientConnectionError, ClientSession, ClientResponseError
-from async_timeout import timeout
 from websocket import WebSocketException
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+try:
+    from asyncio import timeout as _timeout
+except ImportError:  # Python < 3.11
+    from async_timeout import timeout as _timeout
+
 from .api.samsungws import SamsungTVWS
 from .api.exceptions import ConnectionFailure
 from .api.smartthings import SmartThingsTV
@@ -32,6 +44,8 @@ from homeassistant.const import (
 from .const import (
     DOMAIN,
     DEFAULT_NAME,
+    HOST_CACHE_TIME,
+    WS_PORT_HEAD_START,
     DEFAULT_PORT,
     DEFAULT_TIMEOUT,
     DEFAULT_UPDATE_METHOD,
@@ -69,15 +83,59 @@ SAMSMART_SCHEMA = {
     vol.Optional(CONF_SCAN_APP_HTTP, default=True): cv.boolean,
 }
 
+_SAMSMART_KEYS = tuple(key.schema for key in SAMSMART_SCHEMA)
+
+
+def _is_ip_address(host: str) -> bool:
+    """Check if host is already an IP address."""
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def _cached_gethostbyname(host: str) -> str:
+    """Resolve a hostname, caching the result for a short time."""
+    cached = _resolved_hosts.get(host)
+    if cached and time.monotonic() - cached[0] < HOST_CACHE_TIME:
+        return cached[1]
+    ip_address = socket.gethostbyname(host)
+    _resolved_hosts[host] = (time.monotonic(), ip_address)
+    return ip_address
+
+
+def _resolve_host(host: str) -> str:
+    """Return the IP address for host, skipping DNS for IP literals."""
+    if _is_ip_address(host):
+        return host
+    return _cached_gethostbyname(host)
+
 
 def ensure_unique_hosts(value):
     """Validate that all configs have a unique host."""
-    vol.Schema(vol.Unique("duplicate host entries found"))(
-        [socket.gethostbyname(entry[CONF_HOST]) for entry in value]
-    )
+    if len(value) <= 1:
+        return value
+    hosts = set()
+    for entry in value:
+        host = _resolve_host(entry[CONF_HOST])
+        if host in hosts:
+            raise vol.Invalid("duplicate host entries found")
+        hosts.add(host)
     return value
 
 
+_ENTRY_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_HOST): cv.string,
+        vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
+        vol.Optional(CONF_PORT, default=DEFAULT_PORT): cv.port,
+        vol.Optional(CONF_API_KEY): cv.string,
+        vol.Optional(CONF_DEVICE_NAME): cv.string,
+        vol.Optional(CONF_DEVICE_ID): cv.string,
+    }
+).extend(SAMSMART_SCHEMA)
+
 CONFIG_SCHEMA = vol.Schema(
     {
         DOMAIN: vol.All(
@@ -86,16 +144,7 @@ CONFIG_SCHEMA = vol.Schema(
                 cv.deprecated(CONF_PORT),
                 cv.deprecated(CONF_UPDATE_CUSTOM_PING_URL),
                 cv.deprecated(CONF_SCAN_APP_HTTP),
-                vol.Schema(
-                    {
-                        vol.Required(CONF_HOST): cv.string,
-                        vol.Optional(CONF_NAME, default=DEFAULT_NAME): cv.string,
-                        vol.Optional(CONF_PORT, default=DEFAULT_PORT): cv.port,
-                        vol.Optional(CONF_API_KEY): cv.string,
-                        vol.Optional(CONF_DEVICE_NAME): cv.string,
-                        vol.Optional(CONF_DEVICE_ID): cv.string,
-                    }
-                ).extend(SAMSMART_SCHEMA),
+                _ENTRY_SCHEMA,
             ],
             ensure_unique_hosts,
         )
@@ -105,6 +154,8 @@ CONFIG_SCHEMA = vol.Schema(
 
 _LOGGER = logging.getLogger(__name__)
 
+_resolved_hosts = {}
+
 
 def tv_url(host: str, address: str = "") -> str:
     return f"http://{host}:8001/api/v2/{address}"
@@ -115,6 +166,7 @@ class SamsungTVInfo:
         self._hass = hass
         self._hostname = hostname
         self._name = name
+        self._api_v2_base = tv_url(hostname)
 
         self._uuid = None
         self._macaddress = None
@@ -123,11 +175,15 @@ class SamsungTVInfo:
         self._device_os = None
         self._token_support = False
         self._port = 0
+        self._token_file = None
 
     def _gen_token_file(self, port):
         if port != 8002:
             return None
 
+        if self._token_file:
+            return self._token_file
+
         token_file = (
             os.path.dirname(os.path.realpath(__file__))
             + "/token-"
@@ -135,41 +191,86 @@ class SamsungTVInfo:
             + ".txt"
         )
 
-        if os.path.isfile(token_file) is False:
-            # Create token file for catch possible errors
-            try:
-                handle = open(token_file, "w+")
-                handle.close()
-            except:
-                _LOGGER.error(
-                    "Samsung TV - Error creating token file: %s", token_file
-                )
-                return None
+        # Create token file for catch possible errors, without truncating it
+        try:
+            fd = os.open(token_file, os.O_CREAT | os.O_WRONLY | os.O_CLOEXEC, 0o600)
+            os.close(fd)
+        except OSError:
+            _LOGGER.error(
+                "Samsung TV - Error creating token file: %s", token_file
+            )
+            return None
 
+        self._token_file = token_file
         return token_file
 
-    def _try_connect_ws(self):
+    def _probe_port(self, port):
+        """Try to connect to device using web sockets on specific port"""
+
+        try:
+            _LOGGER.debug("Try config with port: %s", str(port))
+            with SamsungTVWS(
+                name=WS_PREFIX
+                + " "
+                + self._name,  # this is the name shown in the TV list of external device.
+                host=self._hostname,
+                port=port,
+                token_file=self._gen_token_file(port),
+                timeout=45,  # We need this high timeout because waiting for auth popup is just an open socket
+            ) as remote:
+                remote.open()
+            _LOGGER.debug("Working config with port: %s", str(port))
+            return RESULT_SUCCESS
+        except (OSError, ConnectionFailure, WebSocketException) as err:
+            _LOGGER.debug("Failing config with port: %s, error: %s", str(port), err)
+
+        return RESULT_NOT_SUCCESSFUL
+
+    def _log_late_probe(self, probe):
+        """Retrieve the result of a probe that lost the race"""
+
+        if probe.cancelled():
+            return
+        err = probe.exception()
+        if err:
+            _LOGGER.debug("Late websocket probe failed, error: %s", err)
+        else:
+            _LOGGER.debug("Late websocket probe result: %s", probe.result())
+
+    async def _try_connect_ws(self):
         """Try to connect to device using web sockets on port 8001 and 8002"""
 
-        for port in (8001, 8002):
-
-            try:
-                _LOGGER.debug("Try config with port: %s", str(port))
-                with SamsungTVWS(
-                    name=WS_PREFIX
-                    + " "
-                    + self._name,  # this is the name shown in the TV list of external device.
-                    host=self._hostname,
-                    port=port,
-                    token_file=self._gen_token_file(port),
-                    timeout=45,  # We need this high timeout because waiting for auth popup is just an open socket
-                ) as remote:
-                    remote.open()
-                _LOGGER.debug("Working config with port: %s", str(port))
-                self._port = port
-                return RESULT_SUCCESS
-            except (OSError, ConnectionFailure, WebSocketException) as err:
-                _LOGGER.debug("Failing config with port: %s, error: %s", str(port), err)
+        # Port 8001 is preferred: give it a head start and only probe 8002 when
+        # it fails or is slow, so token TVs don't get an auth popup needlessly.
+        # Executor jobs can't be cancelled, a losing probe runs to its timeout.
+        probe_8001 = self._hass.async_add_executor_job(self._probe_port, 8001)
+        done, _ = await asyncio.wait({probe_8001}, timeout=WS_PORT_HEAD_START)
+        if done and probe_8001.result() == RESULT_SUCCESS:
+            self._port = 8001
+            return RESULT_SUCCESS
+
+        probes = {
+            self._hass.async_add_executor_job(self._probe_port, 8002): 8002,
+        }
+        if not done:
+            probes[probe_8001] = 8001
+        pending = set(probes)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                success_ports = sorted(
+                    probes[probe]
+                    for probe in done
+                    if probe.result() == RESULT_SUCCESS
+                )
+                if success_ports:
+                    self._port = success_ports[0]
+                    return RESULT_SUCCESS
+        finally:
+            for probe in pending:
+                probe.add_done_callback(self._log_late_probe)
 
         return RESULT_NOT_SUCCESSFUL
 
@@ -177,7 +278,7 @@ class SamsungTVInfo:
         """Try to connect to ST device"""
 
         try:
-            with timeout(10):
+            async with _timeout(10):
                 _LOGGER.debug(
                     "Try connection to SmartThings TV with id [%s]", device_id
                 )
@@ -205,7 +306,7 @@ class SamsungTVInfo:
         """Get list of available ST devices"""
 
         try:
-            with timeout(4):
+            async with _timeout(4):
                 devices = await SmartThingsTV.get_devices_list(
                     api_key, session, st_device_label
                 )
@@ -215,6 +316,24 @@ class SamsungTVInfo:
 
         return devices
 
+    async def _is_reachable(self):
+        """Check that device accepts connections on port 8001"""
+
+        try:
+            async with _timeout(1):
+                _, writer = await asyncio.open_connection(self._hostname, 8001)
+        except (asyncio.TimeoutError, OSError) as err:
+            _LOGGER.debug("TV %s not reachable, error: %s", self._hostname, err)
+            return False
+
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except OSError:
+            pass
+
+        return True
+
     async def get_device_info(
         self, session: ClientSession, api_key=None, st_device_id=None
     ):
@@ -223,18 +342,21 @@ class SamsungTVInfo:
         if session is None:
             return RESULT_NOT_SUCCESSFUL
 
-        result = await self._hass.async_add_executor_job(self._try_connect_ws)
+        if not await self._is_reachable():
+            return RESULT_NOT_SUCCESSFUL
+
+        result = await self._try_connect_ws()
         if result != RESULT_SUCCESS:
             return result
 
         try:
-            with timeout(2):
+            async with _timeout(2):
                 async with session.get(
-                    tv_url(host=self._hostname),
+                    self._api_v2_base,
                     raise_for_status=True
                 ) as resp:
-                    info = await resp.json()
-        except (asyncio.TimeoutError, ClientConnectionError):
+                    info = json_loads(await resp.read())
+        except (asyncio.TimeoutError, ClientConnectionError, ValueError):
             _LOGGER.error("Error getting HTTP info for TV: " + self._hostname)
             return RESULT_NOT_SUCCESSFUL
 
@@ -260,18 +382,32 @@ class SamsungTVInfo:
         return result
 
 
+async def _async_resolve_host(hass: HomeAssistantType, host: str) -> str:
+    """Resolve host in executor, skipping DNS for IP addresses."""
+    if _is_ip_address(host):
+        return host
+    return await hass.async_add_executor_job(socket.gethostbyname, host)
+
+
 async def async_setup(hass: HomeAssistantType, config: ConfigEntry):
     """Set up the Samsung TV integration."""
     if DOMAIN in config:
         hass.data[DOMAIN] = {}
-        for entry_config in config[DOMAIN]:
-            ip_address = await hass.async_add_executor_job(
-                socket.gethostbyname, entry_config[CONF_HOST]
-            )
-            for key in SAMSMART_SCHEMA:
-                hass.data[DOMAIN].setdefault(ip_address, {})[key] = entry_config.get(
-                    key
+        ip_addresses = await asyncio.gather(
+            *[
+                _async_resolve_host(hass, entry_config[CONF_HOST])
+                for entry_config in config[DOMAIN]
+            ],
+            return_exceptions=True,
+        )
+        for entry_config, ip_address in zip(config[DOMAIN], ip_addresses):
+            if isinstance(ip_address, Exception):
+                _LOGGER.error(
+                    "Error resolving host %s: %s", entry_config[CONF_HOST], ip_address
                 )
+                continue
+            bucket = hass.data[DOMAIN].setdefault(ip_address, {})
+            bucket.update({key: entry_config.get(key) for key in _SAMSMART_KEYS})
             if not entry_config.get(CONF_NAME):
                 entry_config[CONF_NAME] = DEFAULT_NAME
             entry_config[SOURCE_IMPORT] = True
@@ -286,10 +422,9 @@ async def async_setup(hass: HomeAssistantType, config: ConfigEntry):
 
 async def async_setup_entry(hass: HomeAssistantType, entry: ConfigEntry):
     """Set up the Samsung TV platform."""
-    hass.data.setdefault(DOMAIN, {}).setdefault(
-        entry.unique_id, {}
-    )  # unique_id = host
-    hass.data[DOMAIN].setdefault(
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    domain_data.setdefault(entry.unique_id, {})  # unique_id = host
+    domain_data.setdefault(
         entry.entry_id,
         {
             "options": {
@@ -310,31 +445,27 @@ async def async_setup_entry(hass: HomeAssistantType, entry: ConfigEntry):
 
 async def async_unload_entry(hass, config_entry):
     """Unload a config entry."""
-    await asyncio.gather(
-        *[hass.config_entries.async_forward_entry_unload(config_entry, MP_DOMAIN)]
+    unload_ok = await hass.config_entries.async_forward_entry_unload(
+        config_entry, MP_DOMAIN
     )
-    for listener in hass.data[DOMAIN][config_entry.entry_id][DATA_LISTENER]:
-        listener()
-    hass.data[DOMAIN].pop(config_entry.entry_id)
-    hass.data[DOMAIN].pop(config_entry.unique_id)
-    if not hass.data[DOMAIN]:
-        hass.data.pop(DOMAIN)
-    return True
+    if unload_ok:
+        for listener in hass.data[DOMAIN][config_entry.entry_id][DATA_LISTENER]:
+            listener()
+        hass.data[DOMAIN].pop(config_entry.entry_id)
+        hass.data[DOMAIN].pop(config_entry.unique_id)
+        if not hass.data[DOMAIN]:
+            hass.data.pop(DOMAIN)
+    return unload_ok
 
 
 async def update_listener(hass, config_entry):
     """Update when config_entry options update."""
-    entry_id = config_entry.entry_id
-    for key, old_value in hass.data[DOMAIN][entry_id][
-        "options"
-    ].items():
-        hass.data[DOMAIN][entry_id]["options"][
-            key
-        ] = new_value = config_entry.options.get(key)
+    options = hass.data[DOMAIN][config_entry.entry_id]["options"]
+    new_options = config_entry.options
+    for key, old_value in list(options.items()):
+        new_value = new_options.get(key)
         if new_value != old_value:
+            options[key] = new_value
             _LOGGER.debug(
-                "Changing option %s from %s to %s",
-                key,
-                old_value,
-                hass.data[DOMAIN][entry_id]["options"][key],
+                "Changing option %s from %s to %s", key, old_value, new_value,
             )
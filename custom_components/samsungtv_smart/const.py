@@ -20,6 +20,8 @@ DEFAULT_NAME = "Samsung TV Remote"
 DEFAULT_PORT = 8001
 DEFAULT_TIMEOUT = 5
 DEFAULT_UPDATE_METHOD = UPDATE_METHODS["Ping"]
+HOST_CACHE_TIME = 60  # seconds
+WS_PORT_HEAD_START = 10  # seconds
 CONF_DEVICE_NAME = "device_name"
 CONF_DEVICE_MODEL = "device_model"
 CONF_UPDATE_METHOD = "update_method"